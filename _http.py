@@ -0,0 +1,90 @@
+import logging
+import random
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 共享 HTTP 连接池：AkShare 每次请求都新建 Session (重新握手 TCP+TLS)，
+# 这里给它换成进程内复用的连接池。AkShare 不复用连接是为了躲开被服务端
+# 关掉的空闲连接，所以连接池挂上底层重试：旧连接失效时自动换新连接重发
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+POOL_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(['GET']),
+    raise_on_status=False,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # 所有用户请求共用一个 Session，不保存任何 Cookie
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                                  max_retries=POOL_RETRY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def request_with_retry(url, params=None, timeout=15, max_retries=3,
+                       base_delay=1.0, random_delay_range=(0.5, 1.5)):
+    # 与 akshare.utils.request.request_with_retry 行为一致，只是复用连接池
+    last_exception = None
+    for attempt in range(max_retries):
+        try:
+            response = get_session().get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+        except (requests.RequestException, ValueError) as e:
+            last_exception = e
+            if attempt < max_retries - 1:
+                # 指数退避 + 随机抖动
+                delay = base_delay * (2 ** attempt) + random.uniform(*random_delay_range)
+                time.sleep(delay)
+    raise last_exception
+
+
+class _PooledRequests:
+    # 只替换 get，其余属性 (exceptions、post 等) 仍指向真正的 requests 模块
+    def get(self, *args, **kwargs):
+        return get_session().get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def install():
+    # 替换 AkShare 模块内部的请求入口；版本不兼容时保留原实现
+    try:
+        from akshare.utils import func
+        from akshare.stock_feature import stock_hist_em
+    except ImportError as e:
+        logging.warning(f"未能接入共享连接池: {e}")
+        return
+
+    # 快照分页接口 (stock_hk_spot_em) 走 fetch_paginated_data -> request_with_retry
+    if hasattr(func, 'request_with_retry'):
+        func.request_with_retry = request_with_retry
+    else:
+        logging.warning("akshare.utils.func 中没有 request_with_retry，快照请求未接入共享连接池")
+    # 历史接口 (stock_hk_hist) 直接调用模块内的 requests.get
+    if getattr(stock_hist_em, 'requests', None) is requests:
+        stock_hist_em.requests = _PooledRequests()
+    else:
+        logging.warning("akshare.stock_feature.stock_hist_em 未直接引用 requests，历史请求未接入共享连接池")
@@ -0,0 +1,91 @@
+import numpy as np
+from numba import njit
+
+# 技术指标内核：只计算最新一帧的值，口径与 pandas_ta 保持一致
+
+
+# 显式签名让编译在导入时完成，而不是拖慢第一次请求
+@njit('UniTuple(f8, 8)(f4[:])', cache=True)
+def compute_all(close):
+    # 一次遍历收盘价，同时得到 RSI_6 / MA5 / MA10 / MA20 / MACD(12,26,9)
+    # 返回 (RSI, MA5, MA10, MA20, MACD, SIGNAL, HIST, 前一帧 HIST)
+    # 输入为 float32 收盘价，累加一律用 float64 保证精度
+    size = close.shape[0]
+    nan = np.nan
+
+    # 均线 (ta.sma)：只累加落在窗口内的收盘价
+    sum5 = 0.0
+    sum10 = 0.0
+    sum20 = 0.0
+
+    # RSI (ta.rsi)：涨跌幅用 RMA 平滑
+    decay = 1.0 - 1.0 / 6
+    gain = 0.0
+    loss = 0.0
+    weight = 0.0
+
+    # MACD (ta.macd)：EMA 首值取前 n 根的 SMA，信号线用前 9 个 MACD 的均值起步
+    a_fast = 2.0 / 13
+    a_slow = 2.0 / 27
+    a_sig = 2.0 / 10
+    ema_fast = 0.0
+    ema_slow = 0.0
+    macd = nan
+    sig = 0.0
+    hist = nan
+    prev_hist = nan
+    prev_c = 0.0
+
+    for i in range(size):
+        c = float(close[i])
+
+        if i >= size - 5:
+            sum5 += c
+        if i >= size - 10:
+            sum10 += c
+        if i >= size - 20:
+            sum20 += c
+
+        if i > 0:
+            diff = c - prev_c
+            gain = gain * decay + (diff if diff > 0 else 0.0)
+            loss = loss * decay + (-diff if diff < 0 else 0.0)
+            weight = weight * decay + 1.0
+
+        if i < 12:
+            ema_fast += c
+            if i == 11:
+                ema_fast /= 12
+        else:
+            ema_fast = a_fast * c + (1.0 - a_fast) * ema_fast
+        if i < 26:
+            ema_slow += c
+            if i == 25:
+                ema_slow /= 26
+        else:
+            ema_slow = a_slow * c + (1.0 - a_slow) * ema_slow
+
+        if i >= 25:
+            macd = ema_fast - ema_slow
+            k = i - 25
+            prev_hist = hist
+            if k < 8:
+                sig += macd
+            elif k == 8:
+                sig = (sig + macd) / 9
+                hist = macd - sig
+            else:
+                sig = a_sig * macd + (1.0 - a_sig) * sig
+                hist = macd - sig
+
+        prev_c = c
+
+    ma5 = sum5 / 5 if size >= 5 else nan
+    ma10 = sum10 / 10 if size >= 10 else nan
+    ma20 = sum20 / 20 if size >= 20 else nan
+    rsi = nan
+    if size > 6 and gain + loss > 0:
+        rsi = 100.0 * gain / (gain + loss)
+    if hist != hist:
+        sig = nan
+    return rsi, ma5, ma10, ma20, macd, sig, hist, prev_hist
@@ -0,0 +1,277 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+import akshare as ak
+import pandas as pd
+import numpy as np
+
+import _http
+from _indicators import compute_all
+
+# AkShare 的上游请求改走共享连接池
+_http.install()
+
+# 实时快照缓存 (全市场快照体积大，短时间内多次请求共用同一份)
+SPOT_TTL = 5  # 秒
+SPOT_NUM_COLS = ['最新价', '成交额', '成交量', '涨跌幅', '换手率']
+NOT_FOUND_MSG = "未找到该股票或代码错误 (请使用5位代码如 02556)"
+
+# 本地磁盘缓存，每个代码一个 parquet 文件，当天写入的直接复用
+HIST_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'hist')
+HIST_COLS = ['日期', '收盘', '成交量']
+
+# 买入信号规则表: 与 analyze 中 conds 的顺序一一对应
+SIGNAL_WEIGHTS = (3, 2, -2)
+SIGNAL_REASONS = ("分时极度超跌(黄金坑)", "RSI严重超卖", None)
+
+# 每个请求线程最多同时发起快照和历史两个上游调用
+# WEB_THREADS 与 gunicorn.conf.py 共用，未设置时按默认 16 线程
+FETCH_WORKERS = 2 * int(os.environ.get('WEB_THREADS', '16'))
+
+
+# 分析核心：持有快照/历史缓存，同一进程内的所有接口共用一个实例
+class StockAnalyzer:
+    def __init__(self, spot_ttl=SPOT_TTL, hist_cache_dir=HIST_CACHE_DIR):
+        self.spot_ttl = spot_ttl
+        self.hist_cache_dir = hist_cache_dir
+
+        self._spot_lock = threading.Lock()
+        self._spot_df = None
+        self._spot_ts = 0.0
+
+        # 历史日线缓存 (收盘后才会变化，按 (代码, 日期) 缓存一整天)
+        self._hist_lock = threading.Lock()
+        self._hist_cache = {}
+        self._hist_day = None
+        # 每个 key 一把锁: 同一代码只拉取一次，不同代码之间互不阻塞
+        self._hist_key_locks = {}
+
+        # 快照与历史数据互不依赖，并发请求上游
+        self._pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+
+    def _spot_stale(self):
+        return self._spot_df is None or time.monotonic() - self._spot_ts >= self.spot_ttl
+
+    def peek_spot_df(self):
+        # 只读缓存，不触发上游请求；缓存过期时返回 None
+        with self._spot_lock:
+            return None if self._spot_stale() else self._spot_df
+
+    def get_spot_df(self):
+        with self._spot_lock:
+            if self._spot_stale():
+                spot_df = ak.stock_hk_spot_em()
+                # 只保留用到的列并统一转成 float64，缩小缓存体积
+                cols = [c for c in SPOT_NUM_COLS if c in spot_df.columns]
+                df = spot_df[['代码'] + cols].copy()
+                df[cols] = df[cols].apply(pd.to_numeric, errors='coerce').astype('float64', copy=False)
+                # 按代码建索引，单只查询走哈希查找而非全表比较
+                self._spot_df = df.set_index('代码', drop=False)
+                self._spot_ts = time.monotonic()
+            return self._spot_df
+
+    def get_hist(self, symbol):
+        # 返回 (日期, 收盘, 成交量) 三个 NumPy 数组，请求路径上不再碰 DataFrame
+        today = datetime.now().date()
+        key = (symbol, today)
+        with self._hist_lock:
+            # 跨日后清空旧缓存
+            if self._hist_day != today:
+                self._hist_cache.clear()
+                self._hist_key_locks.clear()
+                self._hist_day = today
+            if key in self._hist_cache:
+                return self._hist_cache[key]
+            key_lock = self._hist_key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                with self._hist_lock:
+                    hist = self._hist_cache.get(key)
+                if hist is None:
+                    df_hist = self._load_hist_df(symbol, today)
+                    hist = (
+                        df_hist['日期'].to_numpy(dtype='datetime64[D]'),
+                        df_hist['收盘'].to_numpy(dtype=np.float32),
+                        df_hist['成交量'].to_numpy(dtype=np.float64),
+                    )
+                    with self._hist_lock:
+                        self._hist_cache[key] = hist
+                return hist
+            finally:
+                # 缓存已写入或拉取失败后即释放该 key 的锁，避免无效代码的锁常驻内存
+                with self._hist_lock:
+                    if self._hist_key_locks.get(key) is key_lock:
+                        del self._hist_key_locks[key]
+
+    def _load_hist_df(self, symbol, today):
+        # 代码来自 URL 参数，只有纯数字代码才落盘，避免拼出任意路径
+        path = os.path.join(self.hist_cache_dir, f"{symbol}.parquet") if symbol.isdigit() else None
+        if path and os.path.exists(path) and date.fromtimestamp(os.path.getmtime(path)) == today:
+            try:
+                return pd.read_parquet(path)
+            except Exception as e:
+                logging.warning(f"读取历史缓存失败 {path}: {e}")
+
+        df_hist = ak.stock_hk_hist(symbol=symbol, start_date="20240101", adjust="qfq")
+        df_hist = df_hist[HIST_COLS].copy()
+        # 日期解析一次后以 datetime64 存储，请求时无需再逐行转换
+        df_hist['日期'] = pd.to_datetime(df_hist['日期'])
+        # 收盘价存 float32 即可满足三位小数的输出精度，体积减半
+        df_hist['收盘'] = df_hist['收盘'].astype(np.float32)
+        if path:
+            try:
+                os.makedirs(self.hist_cache_dir, exist_ok=True)
+                df_hist.to_parquet(path, index=False)
+            except Exception as e:
+                logging.warning(f"写入历史缓存失败 {path}: {e}")
+        return df_hist
+
+    def analyze(self, symbol):
+        try:
+            # 港股代码为 5 位数字，格式不对的直接拒绝，不请求上游
+            if not (symbol.isdigit() and len(symbol) == 5):
+                return None, NOT_FOUND_MSG
+
+            # 1. 获取实时快照 (Spot)
+            # 快照缓存有效时先确认代码存在再拉历史；否则两者并发请求
+            hist_future = None
+            spot_df = self.peek_spot_df()
+            if spot_df is None:
+                spot_future = self._pool.submit(self.get_spot_df)
+                hist_future = self._pool.submit(self.get_hist, symbol)
+                spot_df = spot_future.result()
+            if symbol not in spot_df.index:
+                return None, NOT_FOUND_MSG
+            row = spot_df.loc[symbol]
+
+            # 提取核心实时数据
+            latest_price = row['最新价']
+            latest_amount = row['成交额']
+            latest_volume = row['成交量']
+            latest_chg_pct = row['涨跌幅']
+            # 换手率反映活跃度
+            turnover_rate = row.get('换手率', 0)
+        
+            # 2. 计算日内 VWAP (均价)
+            if latest_volume > 0:
+                vwap_price = latest_amount / latest_volume
+            else:
+                vwap_price = latest_price
+            
+            vwap_bias = ((latest_price - vwap_price) / vwap_price) * 100
+
+            # 3. 获取历史数据 (用于计算趋势)
+            # 必须获取足够长的数据来计算 MA20 和 MACD
+            if hist_future is None:
+                hist_dates, hist_close, hist_volume = self.get_hist(symbol)
+            else:
+                hist_dates, hist_close, hist_volume = hist_future.result()
+
+            # 剔除可能的今日重复数据，并拼接今日实时收盘价
+            today = datetime.now().date()
+            n = len(hist_close)
+            if n and hist_dates[-1] == np.datetime64(today):
+                n -= 1
+
+            close = np.empty(n + 1, dtype=np.float32)
+            close[:n] = hist_close[:n]
+            close[n] = latest_price
+            prev_volume = hist_volume[n - 1] if n else np.nan
+
+            # 4. 计算复杂指标 (一次遍历收盘价数组得到 RSI / MA / MACD 的最新值)
+            (latest_rsi, latest_ma5, latest_ma10, latest_ma20,
+             latest_macd, latest_signal, latest_hist, prev_hist) = compute_all(close)
+        
+            # 5. 深度逻辑分析 (AI Analyst)
+            trend_status = ""
+            momentum_status = ""
+            advice = ""
+            risk_level = "中"
+        
+            # A. 趋势判断
+            if latest_ma5 < latest_ma10 < latest_ma20:
+                trend_status = "📉 空头排列 (主跌浪)"
+                downward_pressure = "极高"
+            elif latest_ma5 > latest_ma10 > latest_ma20:
+                trend_status = "📈 多头排列 (上升趋势)"
+                downward_pressure = "低"
+            else:
+                trend_status = "〰️ 震荡整理"
+                downward_pressure = "中"
+
+            # B. 动量/利空判断
+            if latest_hist < 0 and latest_macd < latest_signal:
+                momentum_status = "🟢 空头动能增强 (加速下跌)"
+            elif latest_hist > 0 and latest_hist < prev_hist:
+                momentum_status = "⚠️ 多头动能衰减 (上涨乏力)"
+            elif latest_hist > 0:
+                momentum_status = "🔴 多头占优"
+            else:
+                momentum_status = "⚪ 动能不明"
+
+            # C. 综合买入建议
+            # 狙击逻辑: 各条件先算成布尔值，再按权重累加得分
+            conds = (
+                vwap_bias < -2.5,
+                latest_rsi < 20,
+                trend_status.startswith("📉"), # 逆势接飞刀风险大
+            )
+            score = int(np.dot(conds, SIGNAL_WEIGHTS))
+            reasons = [text for cond, text in zip(conds, SIGNAL_REASONS) if cond and text]
+            if conds[2]:
+                risk_level = "高 (逆势)"
+        
+            if score >= 3:
+                advice = "⚡️ 激进买入 (博反弹)"
+            elif score >= 1:
+                advice = "👀 密切观察"
+            else:
+                advice = "🛑 观望/规避"
+
+            # D. 估算抛压 (利用换手率和跌幅)
+            # 既然拿不到沽空数据，我们用“量价背离”来描述抛压
+            selling_pressure = "正常"
+            if latest_chg_pct < -3 and turnover_rate > 1:
+                selling_pressure = "🔥 恐慌性抛售 (放量大跌)"
+            elif latest_chg_pct < 0 and latest_volume < prev_volume:
+                selling_pressure = "阴跌 (无量下跌)"
+
+            result = {
+                "symbol": symbol,
+                "price": latest_price,
+                "change_pct": round(latest_chg_pct, 2),
+                "vwap_bias": round(vwap_bias, 2),
+                "indicators": {
+                    "rsi": round(latest_rsi, 2),
+                    "ma20": round(latest_ma20, 3),
+                    "macd_bar": round(latest_hist, 4)
+                },
+                "analysis": {
+                    "trend": trend_status,
+                    "momentum": momentum_status,
+                    "pressure": selling_pressure,
+                    "downside_risk": downward_pressure
+                },
+                "strategy": {
+                    "advice": advice,
+                    "risk": risk_level,
+                    "reasons": " + ".join(reasons) if reasons else "无特殊信号"
+                }
+            }
+            return result, None
+
+        except Exception as e:
+            logging.error(f"Error: {e}")
+            return None, str(e)
+
+
+# 进程内共享的默认实例
+analyzer = StockAnalyzer()
+
+
+def analyze(symbol):
+    return analyzer.analyze(symbol)
@@ -0,0 +1,12 @@
+# 生产环境启动: gunicorn main:app (自动读取本文件)
+# 单进程多线程: 请求耗时主要在等待上游接口，线程共享同一份快照/历史缓存
+import os
+
+# 线程数由 WEB_THREADS 统一控制，core.py 按同一变量确定上游拉取线程池大小
+os.environ.setdefault('WEB_THREADS', '16')
+
+bind = '0.0.0.0:8080'
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ['WEB_THREADS'])
+timeout = 60